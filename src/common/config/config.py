@@ -27,6 +27,18 @@ def load_config():
     config["MONGO_DB"] = os.getenv("MONGO_DB", "panda")
     config["MONGO_TYPE"] = os.getenv("MONGO_TYPE", "replica_set")
     config["MONGO_REPLICA_SET"] = os.getenv("MONGO_REPLICA_SET", "rs0")
+    config["MONGO_MAX_POOL_SIZE"] = int(os.getenv("MONGO_MAX_POOL_SIZE", 200))
+    config["MONGO_MIN_POOL_SIZE"] = int(os.getenv("MONGO_MIN_POOL_SIZE", 10))
+    config["MONGO_MAX_IDLE_TIME_MS"] = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 300000))
+    config["MONGO_WAIT_QUEUE_TIMEOUT_MS"] = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 10000))
+    config["MONGO_MAX_CONNECTING"] = int(os.getenv("MONGO_MAX_CONNECTING", 4))
+    config["MONGO_COMPRESSORS"] = os.getenv("MONGO_COMPRESSORS", "zstd,snappy,zlib")
+    # exhaust 游标只支持单机和副本集，mongos 等分片部署默认关闭
+    default_exhaust = "true" if config["MONGO_TYPE"] in ("standalone", "replica_set") else "false"
+    config["MONGO_EXHAUST_CURSOR"] = os.getenv("MONGO_EXHAUST_CURSOR", default_exhaust).lower() == "true"
+    config["MONGO_APP_NAME"] = os.getenv("MONGO_APP_NAME", "panda_quantflow")
+    config["MONGO_HEARTBEAT_FREQUENCY_MS"] = int(os.getenv("MONGO_HEARTBEAT_FREQUENCY_MS", 20000))
+    config["MONGO_VERIFY_ON_STARTUP"] = os.getenv("MONGO_VERIFY_ON_STARTUP", "false").lower() == "true"
 
     # 日志配置 Logging
     config["LOG_LEVEL"] = os.getenv("LOG_LEVEL", "DEBUG")
@@ -0,0 +1,107 @@
+"""
+MongoDB 查询结果的进程内 TTL 缓存
+用于缓存配置、基础信息等变化缓慢的数据，命中时不再访问数据库
+"""
+import copy
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# 所有 ttl_cached 创建的缓存，写操作时按集合失效
+_caches = []
+
+
+class TTLCache:
+    """带过期时间的 LRU 缓存，键的前两项为 (db_name, collection_name)"""
+
+    def __init__(self, ttl, maxsize):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return False, None
+            expire_at, value = item
+            if expire_at < time.monotonic():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, db_name, collection_name):
+        with self._lock:
+            for key in [key for key in self._data if key[:2] == (db_name, collection_name)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+def _freeze(value):
+    """
+    将查询参数转换为可哈希的缓存键
+
+    dict 保留键的顺序（sort、projection 的顺序有意义），并带上类型，避免 1、1.0、True 或 dict 与列表混为同一个键
+    """
+    if isinstance(value, dict):
+        return dict, tuple((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return type(value), tuple(_freeze(item) for item in value)
+    try:
+        hash(value)
+        return type(value), value
+    except TypeError:
+        return type(value), json.dumps(value, sort_keys=True, default=str)
+
+
+def ttl_cached(ttl=30, maxsize=1024):
+    """
+    缓存 DatabaseHandler 查询方法的结果，被装饰方法的前两个参数必须为 db_name 和 collection_name
+
+    参数按方法签名归一化后作为缓存键，位置参数和关键字参数的调用共用同一缓存项；
+    命中时返回结果的深拷贝，调用方修改返回值不会污染缓存
+    """
+    def decorator(func):
+        cache = TTLCache(ttl, maxsize)
+        _caches.append(cache)
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = list(bound.arguments.items())[1:]
+            (_, db_name), (_, collection_name) = arguments[:2]
+            key = (db_name, collection_name,
+                   tuple((name, _freeze(value)) for name, value in arguments[2:]))
+            hit, value = cache.get(key)
+            if not hit:
+                value = func(self, *args, **kwargs)
+                cache.set(key, value)
+            return copy.deepcopy(value)
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def bump(db_name, collection_name):
+    """集合发生写操作后，使该集合的所有缓存结果失效"""
+    for cache in _caches:
+        cache.invalidate(db_name, collection_name)
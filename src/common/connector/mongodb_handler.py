@@ -1,75 +1,712 @@
 import pymongo
 import urllib.parse
 import sys
+import os
+import threading
+import logging
+import functools
+import asyncio
+import inspect
+import bson
+from bson import ObjectId
+from pymongo.errors import ConnectionFailure, ConfigurationError, OperationFailure
+from pymongo import AsyncMongoClient, ReadPreference
+from pymongo.results import InsertManyResult, InsertOneResult
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from common.config.config import get_config
+from common.connector.mongodb_cache import ttl_cached, bump
+
+logger = logging.getLogger(__name__)
+
+# 结果保持原始 BSON，访问字段时才按需解码
+_RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+# 已提示过缺少 projection 的集合，每个集合只提示一次
+_unprojected_collections = set()
+
+
+def _check_projection(db_name, collection_name, projection):
+    """
+    查询未指定 projection 时给出提示：整文档传输和 BSON 解码是查询的主要开销
+    """
+    if projection:
+        return
+    key = (db_name, collection_name)
+    if key not in _unprojected_collections:
+        _unprojected_collections.add(key)
+        logger.warning(f"Query on {db_name}.{collection_name} without projection, full documents will be fetched")
+
+
+def _build_connection_args(config):
+    """
+    根据配置构建 MongoDB 连接字符串和客户端参数，同步与异步客户端共用
+
+    结果按 MONGO_* 配置项缓存，同一进程内只构建一次
+
+    Returns:
+        (mongo_uri, client_kwargs, masked_uri)
+    """
+    mongo_config = frozenset((key, value) for key, value in config.items() if key.startswith("MONGO_"))
+    mongo_uri, client_kwargs, masked_uri = _build_connection_args_cached(mongo_config)
+    # 返回副本，避免调用方修改缓存中的参数
+    return mongo_uri, dict(client_kwargs), masked_uri
+
+
+@functools.lru_cache(maxsize=1)
+def _build_connection_args_cached(mongo_config):
+    config = dict(mongo_config)
+    # 用户名和密码都配置时才带认证信息，未开启认证的 MongoDB 可以直接连接
+    has_credentials = bool(config.get("MONGO_USER") and config.get("MONGO_PASSWORD"))
+    encoded_password = urllib.parse.quote_plus(config["MONGO_PASSWORD"]) if has_credentials else ""
+    auth_str = f'{urllib.parse.quote_plus(config["MONGO_USER"])}:{encoded_password}@' if has_credentials else ""
+    mongo_uri = f'mongodb://{auth_str}{config["MONGO_URI"]}/{config["MONGO_DB"]}'
+
+    # 不设置 readPreference 和 socketTimeoutMS：客户端与 panda_server 共用，事务要求主节点读，
+    # GridFS 上传、长时间聚合也不能被套接字超时打断；从节点优先读只用于 DatabaseHandler 的集合
+    client_kwargs = {
+        'w': 'majority',
+        'retryWrites': True,
+        'connectTimeoutMS': 20000,
+        'serverSelectionTimeoutMS': 30000,
+        # 连接池配置，避免突发负载下频繁建连
+        'maxPoolSize': config.get("MONGO_MAX_POOL_SIZE", 200),
+        'minPoolSize': config.get("MONGO_MIN_POOL_SIZE", 10),
+        'maxIdleTimeMS': config.get("MONGO_MAX_IDLE_TIME_MS", 300000),
+        'waitQueueTimeoutMS': config.get("MONGO_WAIT_QUEUE_TIMEOUT_MS", 10000),
+        'maxConnecting': config.get("MONGO_MAX_CONNECTING", 4),
+        # 网络压缩，按顺序与服务端协商
+        'compressors': config.get("MONGO_COMPRESSORS", "zstd,snappy,zlib"),
+        'zlibCompressionLevel': -1,
+        # 服务器监控：降低心跳频率，只使用轮询监控线程
+        'appname': config.get("MONGO_APP_NAME", "panda_quantflow"),
+        'heartbeatFrequencyMS': config.get("MONGO_HEARTBEAT_FREQUENCY_MS", 20000),
+        'serverMonitoringMode': 'poll',
+    }
+
+    if has_credentials:
+        client_kwargs['authSource'] = config.get("MONGO_AUTH_DB") or config["MONGO_DB"]
+
+    if config['MONGO_TYPE'] == 'standalone':
+        client_kwargs['directConnection'] = True
+    elif config['MONGO_TYPE'] == 'replica_set':
+        mongo_uri += f'?replicaSet={config["MONGO_REPLICA_SET"]}'
+
+    masked_uri = mongo_uri.replace(auth_str, "****:****@") if has_credentials else mongo_uri
+    return mongo_uri, client_kwargs, masked_uri
+
+
+# 同步调用提交到的事件循环：宿主应用通过 use_event_loop 绑定，否则在后台守护线程中自动创建
+_loop = None
+_background_loop = None
+_loop_lock = threading.Lock()
+
+# 同步迭代时每次从事件循环取回的文档数
+_ITER_BATCH_SIZE = 1000
+
+
+def _get_loop():
+    global _loop, _background_loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = _background_loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="mongodb-event-loop", daemon=True).start()
+        return _loop
+
+
+def _on_serving_loop():
+    """
+    当前线程是否正在运行为 MongoDB 客户端提供服务的事件循环
+    """
+    try:
+        running_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return running_loop is _loop
+
+
+def _run_sync(coro):
+    """
+    在共享事件循环中执行协程并阻塞等待结果，不能在该事件循环所在线程中调用
+    """
+    loop = _get_loop()
+    if _on_serving_loop():
+        coro.close()
+        raise RuntimeError("Blocking MongoDB call on the event loop that serves it, use AsyncDatabaseHandler instead")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+def use_event_loop(loop):
+    """
+    让 DatabaseHandler 的同步调用提交到宿主应用（如 panda_server）的事件循环，与其共用同一个 AsyncMongoClient
+
+    需在启动时、于该事件循环中调用；之前在后台事件循环上创建的客户端会被关闭，下次访问时在新循环上重建
+    """
+    global _loop, _background_loop
+    with _loop_lock:
+        previous, _loop = _loop, loop
+        background, _background_loop = _background_loop, None
+    if previous is None or previous is loop:
+        return
+    handler = AsyncDatabaseHandler._instance
+    if handler is not None and getattr(handler, 'initialized', False):
+        if previous.is_running():
+            asyncio.run_coroutine_threadsafe(handler.close(), previous).result()
+        else:
+            handler.initialized = False
+    if background is previous:
+        previous.call_soon_threadsafe(previous.stop)
+
+
+def release_event_loop(loop):
+    """
+    宿主应用关闭事件循环前调用，之后的同步调用重新使用后台事件循环
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is not loop:
+            return
+        _loop = None
+    # 绑定在该事件循环上的客户端不能再使用，下次访问时重建
+    handler = AsyncDatabaseHandler._instance
+    if handler is not None:
+        handler.initialized = False
+
+
+def _reset_after_fork():
+    # 子进程中父进程的事件循环线程不存在，客户端也不能跨进程复用，下次访问时重建
+    global _loop, _background_loop, _loop_lock
+    _loop = _background_loop = None
+    _loop_lock = threading.Lock()
+    handler = AsyncDatabaseHandler._instance
+    if handler is not None:
+        handler.initialized = False
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _encode(document):
+    """
+    在调用线程中把文档编码为 BSON，与 PyMongo 一致为缺少 _id 的文档补充 ObjectId
+    """
+    if isinstance(document, RawBSONDocument):
+        return document
+    if "_id" not in document:
+        document["_id"] = ObjectId()
+    return RawBSONDocument(bson.encode(document))
+
+
+def _decode(document):
+    """
+    在调用线程中解码事件循环返回的原始 BSON 文档，解码开销不占用事件循环
+    """
+    return None if document is None else bson.decode(document.raw)
+
+
+# 通过 SyncCollection 转发时需要使 TTL 缓存失效的写操作
+_WRITE_METHODS = frozenset({
+    "update_one", "update_many", "replace_one", "delete_one", "delete_many", "bulk_write",
+    "find_one_and_update", "find_one_and_replace", "find_one_and_delete", "drop",
+})
+
+
+class SyncCursor:
+    """
+    find() 返回的同步游标，兼容 PyMongo Cursor 的常用链式调用
+
+    链式方法只记录参数，开始迭代时才在共享事件循环上创建 AsyncCursor 并按批次取回文档
+    """
+
+    def __init__(self, collection, args, kwargs):
+        self._collection = collection
+        self._args = args
+        self._kwargs = kwargs
+        self._chain = []
+        self._batch_size = None
+        self._iterator = None
+
+    def _chained(name):
+        def method(self, *args, **kwargs):
+            if self._iterator is not None:
+                raise pymongo.errors.InvalidOperation("cannot set options after executing query")
+            self._chain.append((name, args, kwargs))
+            return self
+        method.__name__ = name
+        return method
+
+    sort = _chained("sort")
+    limit = _chained("limit")
+    skip = _chained("skip")
+    hint = _chained("hint")
+    max_time_ms = _chained("max_time_ms")
+    collation = _chained("collation")
+    del _chained
+
+    def batch_size(self, batch_size):
+        self._batch_size = batch_size
+        self._chain.append(("batch_size", (batch_size,), {}))
+        return self
+
+    def _build(self, handler):
+        cursor = self._collection._raw_collection(handler).find(*self._args, **self._kwargs)
+        for name, args, kwargs in self._chain:
+            cursor = getattr(cursor, name)(*args, **kwargs)
+        return cursor
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._iterator is None:
+            db_handler = self._collection._db_handler
+            self._iterator = db_handler._iter_cursor(db_handler._run(self._build),
+                                                     self._batch_size or _ITER_BATCH_SIZE)
+        return next(self._iterator)
+
+    def close(self):
+        if self._iterator is not None:
+            self._iterator.close()
+
+
+class SyncCollection:
+    """
+    同步 Collection 接口，兼容 panda_trading 等直接操作 PyMongo Collection 的旧代码
+
+    所有操作都通过 DatabaseHandler 提交到共享的 AsyncMongoClient，不会另建连接池；
+    未单独实现的方法按名称转发给 AsyncCollection 并阻塞等待结果
+    """
+
+    def __init__(self, db_handler, db_name, collection_name):
+        self._db_handler = db_handler
+        self._db_name = db_name
+        self.name = collection_name
+        self.full_name = f"{db_name}.{collection_name}"
+
+    def _collection(self, handler):
+        return handler.get_mongo_collection(self._db_name, self.name)
+
+    def _raw_collection(self, handler):
+        return handler.get_raw_collection(self._db_name, self.name)
+
+    def find(self, *args, **kwargs):
+        return SyncCursor(self, args, kwargs)
+
+    def find_one(self, *args, **kwargs):
+        return _decode(self._db_handler._run(lambda handler: self._raw_collection(handler).find_one(*args, **kwargs)))
+
+    def insert_one(self, document, **kwargs):
+        raw_document = _encode(document)
+        result = self._db_handler._run(lambda handler: self._collection(handler).insert_one(raw_document, **kwargs))
+        bump(self._db_name, self.name)
+        return InsertOneResult(raw_document["_id"], result.acknowledged)
+
+    def insert_many(self, documents, **kwargs):
+        raw_documents = [_encode(document) for document in documents]
+        result = self._db_handler._run(lambda handler: self._collection(handler).insert_many(raw_documents, **kwargs))
+        bump(self._db_name, self.name)
+        # 预编码的文档 PyMongo 不会记录 inserted_ids，_id 已在编码时补齐
+        return InsertManyResult([document["_id"] for document in raw_documents], result.acknowledged)
+
+    def aggregate(self, pipeline, **kwargs):
+        async def _aggregate(handler):
+            cursor = await self._raw_collection(handler).aggregate(pipeline, **kwargs)
+            return await cursor.to_list(None)
+
+        return iter([_decode(document) for document in self._db_handler._run(_aggregate)])
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def method(*args, **kwargs):
+            result = self._db_handler._run(lambda handler: getattr(self._collection(handler), name)(*args, **kwargs))
+            if name in _WRITE_METHODS:
+                bump(self._db_name, self.name)
+            return result
+
+        method.__name__ = name
+        return method
+
+
+class SyncDatabase:
+    """
+    同步 Database 接口，通过属性或下标获取 SyncCollection，其余方法转发给 AsyncDatabase
+    """
+
+    def __init__(self, db_handler, db_name):
+        self._db_handler = db_handler
+        self.name = db_name
+
+    def get_collection(self, collection_name):
+        return SyncCollection(self._db_handler, self.name, collection_name)
+
+    def __getitem__(self, collection_name):
+        return self.get_collection(collection_name)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.get_collection(name)
+
+    def command(self, *args, **kwargs):
+        return self._db_handler._run(lambda handler: handler.get_mongo_db(self.name).command(*args, **kwargs))
+
+    def list_collection_names(self, *args, **kwargs):
+        return self._db_handler._run(
+            lambda handler: handler.get_mongo_db(self.name).list_collection_names(*args, **kwargs))
+
 
 class DatabaseHandler:
+    """
+    同步 MongoDB 接口，方法签名保持不变，底层与 AsyncDatabaseHandler 共用进程内唯一的 AsyncMongoClient
+
+    每个调用提交到共享事件循环执行并阻塞等待结果，因此可以在回测/实盘进程、脚本或线程池中使用，
+    但不能在该事件循环所在线程（如 FastAPI 接口）中直接调用，异步场景请使用 AsyncDatabaseHandler。
+    文档的 BSON 编码和解码在调用线程中完成。
+    """
+    _instance = None
+    _lock = threading.RLock()
+    DEFAULT_MONGO_DB = None
+
+    def __new__(cls, *args, **kwargs):
+        with cls._lock:
+            if not cls._instance:
+                cls._instance = super(DatabaseHandler, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, config):
+        with self._lock:
+            # 如果已经初始化过，就直接返回，避免重复连接
+            if getattr(self, 'initialized', False):
+                return
+
+            self.config = config
+            self.DEFAULT_MONGO_DB = config['MONGO_DB']
+            self.initialized = False
+
+            # 1. 构建连接字符串和连接参数，配置错误直接抛出，不包装为连接错误
+            _, _, masked_uri = _build_connection_args(config)
+
+            # 2. 打印屏蔽了密码的 URI，用于调试
+            print(f"Using shared MongoDB client: {masked_uri}")
+
+            # 3. 默认不再 ping，连接不可用时第一次查询会在 serverSelectionTimeoutMS 后报错；
+            # 在宿主事件循环中创建时（如 panda_server 启动时导入回测模块）无法阻塞 ping，
+            # 共享客户端已由宿主应用（MongoDB.connect_db）校验过
+            if config.get('MONGO_VERIFY_ON_STARTUP') and not _on_serving_loop():
+                try:
+                    self.ping()
+                    print("MongoDB connection successful.")
+                except (ConnectionFailure, ConfigurationError, OperationFailure) as e:
+                    print(f"FATAL: MongoDB connection failed. Reason: {e}", file=sys.stderr)
+                    # 抛出异常，终止程序启动
+                    raise ConnectionError("Could not connect to MongoDB. Application cannot start.") from e
+            self.initialized = True
+
+    @classmethod
+    def instance(cls):
+        """
+        获取已初始化的单例，不会重新读取配置；尚未初始化时使用全局配置创建
+        """
+        if cls._instance is not None and getattr(cls._instance, 'initialized', False):
+            return cls._instance
+        return cls(get_config())
+
+    def _run(self, call):
+        """
+        在共享事件循环中用 AsyncDatabaseHandler 执行 call 并阻塞等待结果
+
+        call 接收 AsyncDatabaseHandler，返回值可以是协程或普通值
+        """
+        async def _execute():
+            result = call(AsyncDatabaseHandler(self.config))
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+
+        return _run_sync(_execute())
+
+    def _iter_cursor(self, cursor, batch_size, decode=True):
+        try:
+            while True:
+                batch = self._run(lambda handler: cursor.to_list(batch_size))
+                if not batch:
+                    return
+                for document in batch:
+                    yield _decode(document) if decode else document
+        finally:
+            # 提前结束迭代时关闭服务端游标，不等待结果
+            asyncio.run_coroutine_threadsafe(cursor.close(), _get_loop())
+
+    def ping(self):
+        return self._run(lambda handler: handler.ping())
+
+    def mongo_insert(self, db_name, collection_name, document):
+        raw_document = _encode(document)
+        self._run(lambda handler: handler.mongo_insert(db_name, collection_name, raw_document))
+        bump(db_name, collection_name)
+        return document["_id"]
+
+    def mongo_find(self, db_name, collection_name, query, hint=None, sort=None, projection=None, batch_size=None):
+        """
+        Find documents in MongoDB collection
+
+        Args:
+            db_name: Database name
+            collection_name: Collection name
+            query: Query dictionary
+            hint: Optional index hint
+            sort: Optional sort specification
+            projection: Optional projection (field selection)
+            batch_size: Optional cursor batch size, larger values mean fewer getMore round-trips
+
+        Returns:
+            List of documents
+        """
+        # 结果会被一次性读完，使用 exhaust 游标省去每个批次的 getMore 往返（mongos 不支持）
+        cursor_type = pymongo.CursorType.EXHAUST if self.config.get("MONGO_EXHAUST_CURSOR") else None
+        documents = self._run(lambda handler: handler.find_cursor(
+            db_name, collection_name, query, hint=hint, sort=sort, projection=projection,
+            batch_size=batch_size, cursor_type=cursor_type, raw=True).to_list(None))
+        return [_decode(document) for document in documents]
+
+    def mongo_find_indexed(self, db_name, collection_name, query, hint_name, sort=None, projection=None,
+                           batch_size=None):
+        """
+        Find documents using the given index, never falling back to a collection scan
+
+        The server rejects the query if the hinted index does not exist, so a missing
+        index fails loudly instead of silently becoming a COLLSCAN.
+
+        Args:
+            hint_name: Index name (or key specification) that must be used
+
+        Returns:
+            List of documents
+        """
+        if not hint_name:
+            raise ValueError(f"hint_name is required for indexed query on {db_name}.{collection_name}")
+        return self.mongo_find(db_name, collection_name, query, hint=hint_name, sort=sort,
+                               projection=projection, batch_size=batch_size)
+
+    def mongo_iter(self, db_name, collection_name, query, hint=None, sort=None, projection=None, batch_size=None,
+                   cursor_type=None):
+        """
+        Find documents in MongoDB collection and return an iterator for lazy iteration
+
+        Documents are fetched batch by batch while iterating, so memory stays bounded
+        by the batch size instead of the whole result set.
+
+        Args:
+            db_name: Database name
+            collection_name: Collection name
+            query: Query dictionary
+            hint: Optional index hint
+            sort: Optional sort specification
+            projection: Optional projection (field selection)
+            batch_size: Optional cursor batch size
+            cursor_type: Optional pymongo.CursorType
+
+        Returns:
+            Iterator of documents
+        """
+        cursor = self._run(lambda handler: handler.find_cursor(
+            db_name, collection_name, query, hint=hint, sort=sort, projection=projection,
+            batch_size=batch_size, cursor_type=cursor_type, raw=True))
+        return self._iter_cursor(cursor, batch_size or _ITER_BATCH_SIZE)
+
+    def mongo_update(self, db_name, collection_name, query, update):
+        modified_count = self._run(lambda handler: handler.mongo_update(db_name, collection_name, query, update))
+        bump(db_name, collection_name)
+        return modified_count
+
+    def mongo_update_one(self, db_name, collection_name, query, update, upsert=False, **kwargs):
+        result = self._run(lambda handler: handler.mongo_update_one(
+            db_name, collection_name, query, update, upsert=upsert, **kwargs))
+        bump(db_name, collection_name)
+        return result
+
+    def mongo_delete(self, db_name, collection_name, query):
+        deleted_count = self._run(lambda handler: handler.mongo_delete(db_name, collection_name, query))
+        bump(db_name, collection_name)
+        return deleted_count
+
+    def get_mongo_collection(self, db_name, collection_name):
+        """
+        获取同步 Collection 接口，供仍直接操作 Collection 的旧代码使用，底层复用共享客户端
+        """
+        return SyncCollection(self, db_name, collection_name)
+
+    def get_mongo_db(self, db_name=None):
+        """
+        获取同步 Database 接口，供仍直接操作 Database 的旧代码（如 panda_trading）使用，底层复用共享客户端
+        """
+        return SyncDatabase(self, db_name or self.DEFAULT_MONGO_DB or "panda")
+
+    def mongo_insert_many(self, db_name, collection_name, documents, ordered=False):
+        # 默认无序写入，服务端可并行处理且单条失败不会中断后续文档；需要严格顺序时传 ordered=True
+        raw_documents = [_encode(document) for document in documents]
+        self._run(lambda handler: handler.mongo_insert_many(db_name, collection_name, raw_documents, ordered=ordered))
+        bump(db_name, collection_name)
+        # 预编码的文档 PyMongo 不会记录 inserted_ids，_id 已在编码时补齐
+        return [document["_id"] for document in raw_documents]
+
+    def mongo_aggregate(self, db_name, collection_name, aggregation_pipeline):
+        # 不允许落盘：排序、分组等阶段超出内存限制时直接报错，而不是落盘后悄悄变慢（与是否走索引无关）
+        async def _aggregate(handler):
+            cursor = await handler.mongo_aggregate_raw(db_name, collection_name, aggregation_pipeline)
+            return await cursor.to_list(None)
+
+        return [_decode(document) for document in self._run(_aggregate)]
+
+    def mongo_aggregate_raw(self, db_name, collection_name, aggregation_pipeline):
+        """
+        Run an aggregation pipeline and return an iterator of RawBSONDocument
+
+        Result documents are not decoded into dicts; fields are decoded lazily on access,
+        which suits analytics pipelines that only read a few fields of each document.
+
+        Returns:
+            Iterator of RawBSONDocument
+        """
+        cursor = self._run(lambda handler: handler.mongo_aggregate_raw(db_name, collection_name, aggregation_pipeline))
+        return self._iter_cursor(cursor, _ITER_BATCH_SIZE, decode=False)
+
+    def mongo_aggregate_merge(self, db_name, collection_name, aggregation_pipeline, into, merge_options=None):
+        """
+        Run an ETL style aggregation pipeline and write its results server side with $merge
+
+        No result documents are sent back to Python.
+
+        Args:
+            into: Target collection name in the same database
+            merge_options: Optional extra $merge options, e.g. {"on": "symbol", "whenMatched": "replace"}
+
+        Returns:
+            Estimated number of documents in the target collection
+        """
+        count = self._run(lambda handler: handler.mongo_aggregate_merge(
+            db_name, collection_name, aggregation_pipeline, into, merge_options=merge_options))
+        bump(db_name, into)
+        return count
+    
+    @ttl_cached(ttl=30, maxsize=1024)
+    def get_distinct_values(self, db_name, collection_name, field):
+        """Get distinct values for a field (cached for 30s, invalidated by writes through this handler)"""
+        return self._run(lambda handler: handler.get_distinct_values(db_name, collection_name, field))
+
+    def mongo_find_one(self, db_name, collection_name, query, hint=None, projection=None, sort=None):
+        """
+        Find a single document in MongoDB collection
+
+        Args:
+            db_name: Database name
+            collection_name: Collection name
+            query: Query dictionary
+            hint: Optional index hint
+            projection: Optional projection dictionary to specify fields to include/exclude
+            sort: Optional sort specification
+
+        Returns:
+            Single document or None if not found
+        """
+        _check_projection(db_name, collection_name, projection)
+        find_args = {key: value for key, value in
+                     (('hint', hint), ('projection', projection), ('sort', sort)) if value}
+        return _decode(self._run(lambda handler: handler.get_raw_collection(
+            db_name, collection_name).find_one(query, **find_args)))
+
+    @ttl_cached(ttl=30, maxsize=1024)
+    def mongo_find_one_cached(self, db_name, collection_name, query, hint=None, projection=None, sort=None):
+        """
+        Same as mongo_find_one, but results are cached in process for 30 seconds
+
+        Only use for slowly changing data such as configuration and reference lookups.
+        Writes through this handler invalidate the cached results of the collection.
+        """
+        return self.mongo_find_one(db_name, collection_name, query, hint=hint, projection=projection, sort=sort)
+
+    def make_find_one(self, db_name, collection_name, hint=None, projection=None, sort=None, fields=None):
+        """
+        为高频调用的 find_one 生成专用查询函数
+
+        查询参数只在创建时准备一次，之后每次调用只需传入 query。
+        指定 fields 时查询条件模板也预先构建，调用时按顺序传入各字段的值，
+        只替换变化的值，不再在调用处重复构造条件字典。
+
+        Usage:
+            find_stock = handler.make_find_one("panda", "stock_info", projection={'_id': 0, 'name': 1})
+            find_stock({'symbol': '000001.SZ'})
+
+            find_stock = handler.make_find_one("panda", "stock_info", projection={'_id': 0, 'name': 1},
+                                               fields=('symbol',))
+            find_stock('000001.SZ')
+
+        Returns:
+            Callable taking a query dictionary (or the field values when fields is given)
+            and returning a single document or None
+        """
+        _check_projection(db_name, collection_name, projection)
+        find_args = {key: value for key, value in
+                     (('hint', hint), ('projection', projection), ('sort', sort)) if value}
+
+        def _find_one(query):
+            return _decode(self._run(lambda handler: handler.get_raw_collection(
+                db_name, collection_name).find_one(query, **find_args)))
+
+        if fields is None:
+            return _find_one
+
+        # 普通 dict 保持插入顺序，PyMongo 的 C 编码器对其有快速路径（SON 等子类需要逐项迭代）
+        fields = tuple(fields)
+        template = dict.fromkeys(fields)
+
+        def _find_one_by_fields(*values):
+            query = template.copy()
+            for field, value in zip(fields, values, strict=True):
+                query[field] = value
+            return _find_one(query)
+
+        return _find_one_by_fields
+
+
+class AsyncDatabaseHandler:
+    """
+    异步 MongoDB 客户端（基于 PyMongo 原生 asyncio 客户端），方法签名与 DatabaseHandler 保持一致
+
+    在 asyncio 事件循环中使用，网络等待时会让出事件循环，不会阻塞其他协程。
+    持有进程内唯一的 AsyncMongoClient，DatabaseHandler 和 panda_server 的 MongoDB 都复用它。
+    """
     _instance = None
     DEFAULT_MONGO_DB = None
+
     def __new__(cls, *args, **kwargs):
         if not cls._instance:
-            cls._instance = super(DatabaseHandler, cls).__new__(cls)
+            cls._instance = super(AsyncDatabaseHandler, cls).__new__(cls)
         return cls._instance
 
     def __init__(self, config):
-        # 如果已经初始化过，就直接返回，避免重复连接
         if hasattr(self, 'initialized') and self.initialized:
             return
 
         self.config = config
         self.DEFAULT_MONGO_DB = config['MONGO_DB']
-        self.mongo_client = None  # 先确保属性存在并为 None
-
-        try:
-            # 1. 构建连接字符串
-            encoded_password = urllib.parse.quote_plus(config["MONGO_PASSWORD"])
-            mongo_uri = f'mongodb://{config["MONGO_USER"]}:{encoded_password}@{config["MONGO_URI"]}/{config["MONGO_DB"]}'
-            
-            # 2. 准备连接参数
-            client_kwargs = {
-                'readPreference': 'secondaryPreferred',
-                'w': 'majority',
-                'retryWrites': True,
-                'socketTimeoutMS': 30000,
-                'connectTimeoutMS': 20000,
-                'serverSelectionTimeoutMS': 30000,
-                'authSource': config["MONGO_AUTH_DB"],
-            }
-
-            if config['MONGO_TYPE'] == 'standalone':
-                client_kwargs['directConnection'] = True
-            elif config['MONGO_TYPE'] == 'replica_set':
-                mongo_uri += f'?replicaSet={config["MONGO_REPLICA_SET"]}'
-                client_kwargs['heartbeatFrequencyMS'] = 10000
-
-            # 3. 打印屏蔽了密码的 URI，用于调试
-            masked_uri = mongo_uri.replace(encoded_password, "****")
-            print(f"Attempting to connect to MongoDB: {masked_uri}")
-
-            # 4. 尝试连接并创建客户端
-            self.mongo_client = pymongo.MongoClient(mongo_uri, **client_kwargs)
-
-            # 5. 发送 ping 命令以验证连接
-            self.mongo_client.admin.command('ping')
-            
-            print("MongoDB connection successful.")
-            self.initialized = True
 
-        except Exception as e:
-            # 6. 如果以上任何一步失败，都会进入这里
-            print(f"FATAL: MongoDB connection failed. Reason: {e}", file=sys.stderr)
-            
-            # 关闭可能已部分创建的连接
-            if self.mongo_client:
-                self.mongo_client.close()
-            
-            # 抛出异常，终止程序启动
-            raise ConnectionError("Could not connect to MongoDB. Application cannot start.") from e
+        mongo_uri, client_kwargs, masked_uri = _build_connection_args(config)
+        print(f"Creating async MongoDB client: {masked_uri}")
+        # 客户端在第一次操作时才真正建立连接
+        self.mongo_client = AsyncMongoClient(mongo_uri, **client_kwargs)
+        self._coll_cache = {}
+        self.initialized = True
 
-    def mongo_insert(self, db_name, collection_name, document):
+    async def mongo_insert(self, db_name, collection_name, document):
         collection = self.get_mongo_collection(db_name, collection_name)
-        return collection.insert_one(document).inserted_id
+        result = await collection.insert_one(document)
+        return result.inserted_id
 
-    def mongo_find(self, db_name, collection_name, query, hint=None, sort=None, projection=None):
+    async def mongo_find(self, db_name, collection_name, query, hint=None, sort=None, projection=None, length=None):
         """
         Find documents in MongoDB collection
 
@@ -80,55 +717,159 @@ class DatabaseHandler:
             hint: Optional index hint
             sort: Optional sort specification
             projection: Optional projection (field selection)
+            length: Optional maximum number of documents to return
 
         Returns:
             List of documents
         """
-        collection = self.get_mongo_collection(db_name, collection_name)
-        cursor = collection.find(query, projection)  # Adding projection here
+        cursor = self.find_cursor(db_name, collection_name, query, hint=hint, sort=sort, projection=projection)
+        return await cursor.to_list(length)
+
+    async def mongo_find_indexed(self, db_name, collection_name, query, hint_name, sort=None, projection=None,
+                                 length=None):
+        """
+        Find documents using the given index, never falling back to a collection scan
+
+        Returns:
+            List of documents
+        """
+        if not hint_name:
+            raise ValueError(f"hint_name is required for indexed query on {db_name}.{collection_name}")
+        return await self.mongo_find(db_name, collection_name, query, hint=hint_name, sort=sort,
+                                     projection=projection, length=length)
+
+    async def mongo_iter(self, db_name, collection_name, query, hint=None, sort=None, projection=None, batch_size=None):
+        """
+        Find documents in MongoDB collection and yield them one by one
+
+        Usage: ``async for doc in handler.mongo_iter(...)``
+
+        Args:
+            db_name: Database name
+            collection_name: Collection name
+            query: Query dictionary
+            hint: Optional index hint
+            sort: Optional sort specification
+            projection: Optional projection (field selection)
+            batch_size: Optional cursor batch size
+        """
+        cursor = self.find_cursor(db_name, collection_name, query, hint=hint, sort=sort, projection=projection,
+                                  batch_size=batch_size)
+        async for document in cursor:
+            yield document
+
+    def find_cursor(self, db_name, collection_name, query, hint=None, sort=None, projection=None, batch_size=None,
+                    cursor_type=None, raw=False):
+        """
+        Build an AsyncCursor for the query, no request is sent until it is iterated
+
+        Args:
+            cursor_type: Optional pymongo.CursorType
+            raw: Return RawBSONDocument instead of decoded dicts
+        """
+        _check_projection(db_name, collection_name, projection)
+        if raw:
+            collection = self.get_raw_collection(db_name, collection_name)
+        else:
+            collection = self.get_mongo_collection(db_name, collection_name)
+        find_args = {'cursor_type': cursor_type} if cursor_type is not None else {}
+        cursor = collection.find(query, projection, **find_args)
         if hint:
             cursor = cursor.hint(hint)
         if sort:
             cursor = cursor.sort(sort)
-        return list(cursor)
+        if batch_size:
+            cursor = cursor.batch_size(batch_size)
+        return cursor
 
-    def mongo_update(self, db_name, collection_name, query, update):
+    async def mongo_update(self, db_name, collection_name, query, update):
         collection = self.get_mongo_collection(db_name, collection_name)
-        return collection.update_many(query, {'$set': update}).modified_count
+        result = await collection.update_many(query, {'$set': update})
+        return result.modified_count
 
-    def mongo_update_one(self, db_name, collection_name, query, update, upsert=False, **kwargs):
+    async def mongo_update_one(self, db_name, collection_name, query, update, upsert=False, **kwargs):
         collection = self.get_mongo_collection(db_name, collection_name)
-        return collection.update_many(
+        return await collection.update_one(
             filter=query,
             update=update,
             upsert=upsert,
             **kwargs
         )
 
-    def mongo_delete(self, db_name, collection_name, query):
+    async def mongo_delete(self, db_name, collection_name, query):
         collection = self.get_mongo_collection(db_name, collection_name)
-        return collection.delete_many(query).deleted_count
+        result = await collection.delete_many(query)
+        return result.deleted_count
 
     def get_mongo_collection(self, db_name, collection_name):
-        return self.mongo_client[db_name][collection_name]
+        # 缓存 Collection 对象，避免每次查询都重新构造 Database/Collection
+        key = (db_name, collection_name)
+        collection = self._coll_cache.get(key)
+        if collection is None:
+            collection = self.get_mongo_db(db_name)[collection_name]
+            self._coll_cache[key] = collection
+        return collection
 
-    def get_mongo_db(self,db_name=DEFAULT_MONGO_DB or "panda"):
-        return self.mongo_client[db_name]
+    def get_raw_collection(self, db_name, collection_name):
+        # 返回 RawBSONDocument 的集合，供 DatabaseHandler 在调用线程中解码
+        key = (db_name, collection_name, RawBSONDocument)
+        collection = self._coll_cache.get(key)
+        if collection is None:
+            collection = self.get_mongo_collection(db_name, collection_name).with_options(
+                codec_options=_RAW_CODEC_OPTIONS)
+            self._coll_cache[key] = collection
+        return collection
 
-    def mongo_insert_many(self, db_name, collection_name, documents):
+    def get_mongo_db(self, db_name=None):
+        # 行情、回测数据允许从从节点读取；客户端本身保持主节点读，panda_server 的事务不受影响
+        return self.mongo_client.get_database(db_name or self.DEFAULT_MONGO_DB or "panda",
+                                              read_preference=ReadPreference.SECONDARY_PREFERRED)
+
+    async def ping(self):
+        return await self.mongo_client.admin.command('ping')
+
+    async def mongo_insert_many(self, db_name, collection_name, documents, ordered=False):
+        # 默认无序写入，服务端可并行处理且单条失败不会中断后续文档；需要严格顺序时传 ordered=True
         collection = self.get_mongo_collection(db_name, collection_name)
-        return collection.insert_many(documents).inserted_ids
+        result = await collection.insert_many(documents, ordered=ordered, bypass_document_validation=False)
+        return result.inserted_ids
 
-    def mongo_aggregate(self, db_name, collection_name, aggregation_pipeline):
+    async def mongo_aggregate(self, db_name, collection_name, aggregation_pipeline):
         collection = self.get_mongo_collection(db_name, collection_name)
-        return list(collection.aggregate(aggregation_pipeline)) 
-    
-    def get_distinct_values(self, db_name, collection_name, field):
+        cursor = await collection.aggregate(aggregation_pipeline, allowDiskUse=False)
+        return await cursor.to_list(None)
+
+    async def mongo_aggregate_raw(self, db_name, collection_name, aggregation_pipeline):
+        """
+        Run an aggregation pipeline and return a cursor of RawBSONDocument
+
+        Usage: ``async for doc in await handler.mongo_aggregate_raw(...)``
+
+        Returns:
+            pymongo AsyncCommandCursor yielding RawBSONDocument
+        """
+        collection = self.get_raw_collection(db_name, collection_name)
+        return await collection.aggregate(aggregation_pipeline, allowDiskUse=False)
+
+    async def mongo_aggregate_merge(self, db_name, collection_name, aggregation_pipeline, into, merge_options=None):
+        """
+        Run an ETL style aggregation pipeline and write its results server side with $merge
+
+        Returns:
+            Estimated number of documents in the target collection
+        """
+        collection = self.get_mongo_collection(db_name, collection_name)
+        merge_stage = {"$merge": {"into": into, **(merge_options or {})}}
+        cursor = await collection.aggregate(list(aggregation_pipeline) + [merge_stage], allowDiskUse=False)
+        await cursor.close()
+        return await self.get_mongo_collection(db_name, into).estimated_document_count()
+
+    async def get_distinct_values(self, db_name, collection_name, field):
         """Get distinct values for a field"""
         collection = self.get_mongo_collection(db_name, collection_name)
-        return collection.distinct(field)
+        return await collection.distinct(field)
 
-    def mongo_find_one(self, db_name, collection_name, query, hint=None, projection=None, sort=None):
+    async def mongo_find_one(self, db_name, collection_name, query, hint=None, projection=None, sort=None):
         """
         Find a single document in MongoDB collection
 
@@ -143,6 +884,7 @@ class DatabaseHandler:
         Returns:
             Single document or None if not found
         """
+        _check_projection(db_name, collection_name, projection)
         collection = self.get_mongo_collection(db_name, collection_name)
         find_args = {}
 
@@ -153,4 +895,10 @@ class DatabaseHandler:
         if sort:
             find_args['sort'] = sort
 
-        return collection.find_one(query, **find_args)
\ No newline at end of file
+        return await collection.find_one(query, **find_args)
+
+    async def close(self):
+        if self.mongo_client:
+            await self.mongo_client.close()
+        self._coll_cache.clear()
+        self.initialized = False
@@ -0,0 +1,100 @@
+from common.connector import mongodb_cache
+from common.connector.mongodb_cache import ttl_cached, bump, _freeze
+
+
+class FakeHandler:
+    """记录实际查询次数的假 DatabaseHandler"""
+
+    def __init__(self):
+        self.calls = 0
+
+    @ttl_cached(ttl=30, maxsize=2)
+    def find_one(self, db_name, collection_name, query, projection=None, sort=None):
+        self.calls += 1
+        return {"query": query, "sort": sort, "values": [self.calls]}
+
+
+def _handler():
+    FakeHandler.find_one.cache.clear()
+    return FakeHandler()
+
+
+def test_hit_returns_cached_result():
+    """测试相同参数的第二次调用命中缓存"""
+    handler = _handler()
+    handler.find_one("panda", "stock_info", {"symbol": "000001.SZ"})
+    handler.find_one("panda", "stock_info", {"symbol": "000001.SZ"})
+    assert handler.calls == 1
+
+
+def test_positional_and_keyword_calls_share_entry():
+    """测试位置参数与关键字参数调用归一化为同一个缓存键"""
+    handler = _handler()
+    handler.find_one("panda", "stock_info", {"symbol": "000001.SZ"}, None, [("date", -1)])
+    handler.find_one(db_name="panda", collection_name="stock_info", query={"symbol": "000001.SZ"},
+                     sort=[("date", -1)])
+    assert handler.calls == 1
+
+
+def test_sort_order_is_part_of_key():
+    """测试 sort 字段顺序不同的查询不会共用缓存项"""
+    assert _freeze({"a": 1, "b": -1}) != _freeze({"b": -1, "a": 1})
+    handler = _handler()
+    first = handler.find_one("panda", "stock_info", {}, sort={"a": 1, "b": -1})
+    second = handler.find_one("panda", "stock_info", {}, sort={"b": -1, "a": 1})
+    assert handler.calls == 2
+    assert list(first["sort"]) == ["a", "b"] and list(second["sort"]) == ["b", "a"]
+
+
+def test_value_types_are_part_of_key():
+    """测试 1、True 与 dict、列表等不同类型的值不会共用缓存项"""
+    assert _freeze({"flag": 1}) != _freeze({"flag": True})
+    assert _freeze({"a": {"b": 1}}) != _freeze({"a": [("b", 1)]})
+
+
+def test_ttl_expiry(monkeypatch):
+    """测试缓存项过期后重新查询"""
+    now = [1000.0]
+    monkeypatch.setattr(mongodb_cache.time, "monotonic", lambda: now[0])
+    handler = _handler()
+    handler.find_one("panda", "stock_info", {"symbol": "000001.SZ"})
+    now[0] += 29
+    handler.find_one("panda", "stock_info", {"symbol": "000001.SZ"})
+    assert handler.calls == 1
+    now[0] += 2
+    handler.find_one("panda", "stock_info", {"symbol": "000001.SZ"})
+    assert handler.calls == 2
+
+
+def test_lru_eviction():
+    """测试超过 maxsize 时淘汰最久未使用的缓存项"""
+    handler = _handler()
+    handler.find_one("panda", "stock_info", {"symbol": "a"})
+    handler.find_one("panda", "stock_info", {"symbol": "b"})
+    handler.find_one("panda", "stock_info", {"symbol": "a"})  # a 变为最近使用
+    handler.find_one("panda", "stock_info", {"symbol": "c"})  # 淘汰 b
+    assert handler.calls == 3
+    handler.find_one("panda", "stock_info", {"symbol": "a"})
+    assert handler.calls == 3
+    handler.find_one("panda", "stock_info", {"symbol": "b"})
+    assert handler.calls == 4
+
+
+def test_bump_invalidates_only_that_collection():
+    """测试 bump 只使对应集合的缓存失效"""
+    handler = _handler()
+    handler.find_one("panda", "stock_info", {"symbol": "a"})
+    handler.find_one("panda", "future_info", {"symbol": "a"})
+    bump("panda", "stock_info")
+    handler.find_one("panda", "future_info", {"symbol": "a"})
+    assert handler.calls == 2
+    handler.find_one("panda", "stock_info", {"symbol": "a"})
+    assert handler.calls == 3
+
+
+def test_hit_returns_deep_copy():
+    """测试修改返回值不会污染缓存"""
+    handler = _handler()
+    result = handler.find_one("panda", "stock_info", {"symbol": "a"})
+    result["values"].append(99)
+    assert handler.find_one("panda", "stock_info", {"symbol": "a"})["values"] == [1]
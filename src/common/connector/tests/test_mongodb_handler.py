@@ -0,0 +1,345 @@
+import asyncio
+import threading
+import uuid
+import pytest
+import dotenv
+from bson import ObjectId
+from pymongo import MongoClient
+from pymongo.errors import ConnectionFailure
+from pymongo.results import InsertManyResult, InsertOneResult, UpdateResult
+from common.config.config import config
+from common.connector import mongodb_handler
+from common.connector.mongodb_handler import DatabaseHandler, use_event_loop, release_event_loop
+
+TEST_COLLECTION = "test_mongodb_handler"
+
+
+class TestDatabaseHandler:
+    """测试 DatabaseHandler 类的功能"""
+
+    @classmethod
+    def setup_class(cls):
+        """在整个测试类开始前执行一次"""
+        dotenv.load_dotenv()
+        cls.test_run_id = str(uuid.uuid4())[:8]
+        # 先用短超时的客户端探测，数据库不可用时立即跳过，不必等待 serverSelectionTimeoutMS
+        mongo_uri, client_kwargs, _ = mongodb_handler._build_connection_args(config)
+        probe = MongoClient(mongo_uri, **{**client_kwargs, "serverSelectionTimeoutMS": 500})
+        try:
+            probe.admin.command("ping")
+        except ConnectionFailure as e:
+            pytest.skip(f"数据库连接失败: {e}")
+        finally:
+            probe.close()
+        try:
+            cls.handler = DatabaseHandler(config)
+            cls.handler.ping()
+        except (ConnectionError, ConnectionFailure) as e:
+            pytest.skip(f"数据库连接失败: {e}")
+
+    @classmethod
+    def teardown_class(cls):
+        """测试结束后清理测试数据"""
+        if hasattr(cls, "handler"):
+            cls.handler.mongo_delete(config["MONGO_DB"], TEST_COLLECTION, {"test_run_id": cls.test_run_id})
+
+    def test_mongo_update_one_updates_single_document(self):
+        """测试 mongo_update_one 只更新一条匹配的文档"""
+        documents = [{"test_run_id": self.test_run_id, "value": 0} for _ in range(3)]
+        self.handler.mongo_insert_many(config["MONGO_DB"], TEST_COLLECTION, documents)
+
+        result = self.handler.mongo_update_one(
+            config["MONGO_DB"],
+            TEST_COLLECTION,
+            query={"test_run_id": self.test_run_id},
+            update={"$set": {"value": 1}},
+        )
+
+        assert isinstance(result, UpdateResult)
+        assert result.matched_count <= 1
+        updated = self.handler.mongo_find(
+            config["MONGO_DB"], TEST_COLLECTION, {"test_run_id": self.test_run_id, "value": 1}
+        )
+        assert len(updated) == 1
+
+
+def test_get_mongo_db_defaults_to_configured_database(monkeypatch):
+    """测试 get_mongo_db 不传参数时使用配置中的 MONGO_DB（客户端惰性连接，无需数据库可用）"""
+    handler = DatabaseHandler.instance()
+    assert handler.get_mongo_db().name == config["MONGO_DB"]
+
+    # 默认库在调用时解析，而不是在定义方法时固定为 "panda"
+    monkeypatch.setattr(handler, "DEFAULT_MONGO_DB", "panda_handler_test")
+    assert handler.get_mongo_db().name == "panda_handler_test"
+
+
+class FakeCursor:
+    """记录链式调用和每次 to_list 批次的假 AsyncCursor"""
+
+    def __init__(self, documents):
+        self.documents = list(documents)
+        self.chain = []
+        self.batches = []
+        self.closed = False
+
+    def sort(self, *args):
+        self.chain.append(("sort", args))
+        return self
+
+    def limit(self, *args):
+        self.chain.append(("limit", args))
+        return self
+
+    def batch_size(self, *args):
+        self.chain.append(("batch_size", args))
+        return self
+
+    async def to_list(self, length):
+        self.batches.append(length)
+        batch, self.documents = self.documents[:length], self.documents[length:]
+        return batch
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeCollection:
+    """保存原始 BSON 文档，并记录执行线程的假 AsyncCollection"""
+
+    def __init__(self):
+        self.documents = []
+        self.cursors = []
+        self.threads = []
+
+    async def insert_one(self, document):
+        self.threads.append(threading.current_thread().name)
+        self.documents.append(document)
+        # 与 PyMongo 一致，预编码的文档不会返回 inserted_id
+        return InsertOneResult(None, True)
+
+    async def insert_many(self, documents, ordered=True, bypass_document_validation=False):
+        self.threads.append(threading.current_thread().name)
+        self.documents.extend(documents)
+        return InsertManyResult([], True)
+
+    def find(self, *args, **kwargs):
+        cursor = FakeCursor(self.documents)
+        self.cursors.append(cursor)
+        return cursor
+
+    async def find_one(self, *args, **kwargs):
+        return self.documents[0] if self.documents else None
+
+    async def update_one(self, query, update, upsert=False):
+        self.threads.append(threading.current_thread().name)
+        return UpdateResult({"n": 1, "nModified": 1}, True)
+
+
+class FakeAsyncHandler:
+    """替代 AsyncDatabaseHandler 的单例，数据库操作复用真实实现，集合替换为 FakeCollection"""
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.collections = {}
+        return cls._instance
+
+    def __init__(self, config):
+        self.initialized = True
+
+    def get_mongo_collection(self, db_name, collection_name):
+        return self.collections.setdefault((db_name, collection_name), FakeCollection())
+
+    get_raw_collection = get_mongo_collection
+
+    async def close(self):
+        self.initialized = False
+
+    mongo_insert = mongodb_handler.AsyncDatabaseHandler.mongo_insert
+    mongo_insert_many = mongodb_handler.AsyncDatabaseHandler.mongo_insert_many
+
+
+@pytest.fixture
+def fake_async(monkeypatch):
+    """用 FakeAsyncHandler 替换共享客户端，并在测试结束后停止后台事件循环、恢复模块状态"""
+    FakeAsyncHandler._instance = None
+    monkeypatch.setattr(mongodb_handler, "AsyncDatabaseHandler", FakeAsyncHandler)
+    monkeypatch.setattr(mongodb_handler, "_loop", None)
+    monkeypatch.setattr(mongodb_handler, "_background_loop", None)
+    yield FakeAsyncHandler(config)
+    loop = mongodb_handler._background_loop
+    if loop is not None:
+        loop.call_soon_threadsafe(loop.stop)
+
+
+def _flush(handler):
+    # 提交一个空调用，确保之前提交到事件循环的回调（如关闭游标）已经执行
+    handler._run(lambda async_handler: None)
+
+
+def test_run_executes_on_event_loop_thread(fake_async):
+    """测试同步调用在后台事件循环线程中执行，协程和普通返回值都能取回"""
+    handler = DatabaseHandler.instance()
+    assert handler._run(lambda async_handler: threading.current_thread().name) == "mongodb-event-loop"
+
+    async def _call(async_handler):
+        return async_handler is fake_async
+
+    assert handler._run(_call) is True
+
+
+def test_run_raises_on_serving_loop(fake_async):
+    """测试在提供服务的事件循环线程中阻塞调用直接报错，而不是死锁"""
+    handler = DatabaseHandler.instance()
+
+    async def _main():
+        loop = asyncio.get_running_loop()
+        use_event_loop(loop)
+        try:
+            with pytest.raises(RuntimeError):
+                handler._run(lambda async_handler: None)
+            # 其他线程中的同步调用提交到宿主事件循环执行
+            return await asyncio.to_thread(handler._run, lambda async_handler: threading.current_thread().name)
+        finally:
+            release_event_loop(loop)
+
+    assert asyncio.run(_main()) == threading.current_thread().name
+
+
+def test_use_event_loop_moves_client_to_host_loop(fake_async):
+    """测试切换到宿主事件循环时关闭后台循环上的客户端，释放后重新使用后台循环"""
+    handler = DatabaseHandler.instance()
+    _flush(handler)
+    background = mongodb_handler._background_loop
+    assert background is not None
+
+    async def _main():
+        loop = asyncio.get_running_loop()
+        use_event_loop(loop)
+        assert fake_async.initialized is False
+        assert mongodb_handler._background_loop is None
+        fake_async.initialized = True
+        release_event_loop(loop)
+
+    asyncio.run(_main())
+    assert fake_async.initialized is False
+    assert mongodb_handler._loop is None
+    assert handler._run(lambda async_handler: threading.current_thread().name) == "mongodb-event-loop"
+    assert mongodb_handler._background_loop is not background
+
+
+def test_reset_after_fork(fake_async):
+    """测试 fork 后子进程丢弃父进程的事件循环和客户端"""
+    handler = DatabaseHandler.instance()
+    _flush(handler)
+    parent_loop = mongodb_handler._loop
+    try:
+        mongodb_handler._reset_after_fork()
+        assert mongodb_handler._loop is None
+        assert fake_async.initialized is False
+    finally:
+        parent_loop.call_soon_threadsafe(parent_loop.stop)
+
+
+def test_iter_cursor_fetches_in_batches(fake_async):
+    """测试 _iter_cursor 按批次取回并解码文档，结束后关闭游标"""
+    handler = DatabaseHandler.instance()
+    cursor = FakeCursor(mongodb_handler._encode({"i": i}) for i in range(5))
+    documents = list(handler._iter_cursor(cursor, 2))
+    _flush(handler)
+    assert [document["i"] for document in documents] == list(range(5))
+    assert cursor.batches == [2, 2, 2, 2]
+    assert cursor.closed
+
+
+def test_iter_cursor_closes_on_early_break(fake_async):
+    """测试提前结束迭代时关闭游标，且不再取后续批次"""
+    handler = DatabaseHandler.instance()
+    cursor = FakeCursor(mongodb_handler._encode({"i": i}) for i in range(5))
+    iterator = handler._iter_cursor(cursor, 2)
+    assert next(iterator)["i"] == 0
+    iterator.close()
+    _flush(handler)
+    assert cursor.batches == [2]
+    assert cursor.closed
+
+
+def test_mongo_insert_returns_assigned_id(fake_async):
+    """测试 mongo_insert 在调用线程中补充 _id 并返回，已有的 _id 保持不变"""
+    handler = DatabaseHandler.instance()
+    document = {"value": 1}
+    inserted_id = handler.mongo_insert("panda", TEST_COLLECTION, document)
+    assert isinstance(inserted_id, ObjectId) and document["_id"] == inserted_id
+    assert handler.mongo_insert("panda", TEST_COLLECTION, {"_id": "fixed", "value": 2}) == "fixed"
+
+    collection = fake_async.get_mongo_collection("panda", TEST_COLLECTION)
+    assert [stored["_id"] for stored in collection.documents] == [inserted_id, "fixed"]
+    assert collection.threads == ["mongodb-event-loop"] * 2
+
+
+def test_mongo_insert_many_returns_ids(fake_async):
+    """测试 mongo_insert_many 按输入顺序返回所有文档的 _id"""
+    handler = DatabaseHandler.instance()
+    documents = [{"value": 1}, {"_id": "fixed", "value": 2}]
+    inserted_ids = handler.mongo_insert_many("panda", TEST_COLLECTION, documents)
+    assert inserted_ids == [documents[0]["_id"], "fixed"]
+    assert isinstance(inserted_ids[0], ObjectId)
+
+
+def test_mongo_insert_many_accepts_generators(fake_async):
+    """测试 mongo_insert_many 接收生成器和缺少 _id 的原始 BSON 文档时也返回全部 _id"""
+    handler = DatabaseHandler.instance()
+    inserted_ids = handler.mongo_insert_many(
+        "panda", TEST_COLLECTION, (mongodb_handler._encode({"value": i}) for i in range(3)))
+    stored = fake_async.get_mongo_collection("panda", TEST_COLLECTION).documents
+    assert inserted_ids == [document["_id"] for document in stored]
+    assert len(inserted_ids) == 3
+
+
+def test_verify_on_startup_skips_ping_on_serving_loop(fake_async, monkeypatch):
+    """测试在宿主事件循环中创建 DatabaseHandler 时不阻塞 ping，而是直接完成初始化"""
+    monkeypatch.setattr(DatabaseHandler, "_instance", None)
+
+    async def _main():
+        loop = asyncio.get_running_loop()
+        use_event_loop(loop)
+        try:
+            return DatabaseHandler({**config, "MONGO_VERIFY_ON_STARTUP": True})
+        finally:
+            release_event_loop(loop)
+
+    assert asyncio.run(_main()).initialized
+
+
+def test_get_mongo_db_facade_uses_shared_client(fake_async):
+    """测试 get_mongo_db 返回的同步接口通过共享客户端读写，并按原顺序执行链式调用"""
+    handler = DatabaseHandler.instance()
+    collection = handler.get_mongo_db("panda").stock_info
+    assert collection is not None and handler.get_mongo_db("panda")["stock_info"].full_name == "panda.stock_info"
+
+    result = collection.insert_many([{"i": i} for i in range(3)])
+    assert len(result.inserted_ids) == 3
+    assert collection.insert_one({"i": 3}).inserted_id is not None
+
+    documents = list(collection.find({}, {"_id": 0}).sort([("i", 1)]).limit(10))
+    assert [document["i"] for document in documents] == [0, 1, 2, 3]
+    fake_collection = fake_async.get_mongo_collection("panda", "stock_info")
+    assert fake_collection.cursors[0].chain == [("sort", ([("i", 1)],)), ("limit", (10,))]
+
+    assert collection.find_one({"i": 0})["i"] == 0
+    assert collection.update_one({"i": 0}, {"$set": {"i": 9}}, upsert=True).modified_count == 1
+    assert set(fake_collection.threads) == {"mongodb-event-loop"}
+
+
+def test_make_find_one_fields_require_every_value(fake_async):
+    """测试按字段查询时传入的值个数与字段个数不一致直接报错，而不是用不完整的条件查询"""
+    handler = DatabaseHandler.instance()
+    handler.mongo_insert("panda", TEST_COLLECTION, {"symbol": "000001.SZ", "date": "20240102"})
+    find_one = handler.make_find_one("panda", TEST_COLLECTION, fields=("symbol", "date"))
+    assert find_one("000001.SZ", "20240102")["symbol"] == "000001.SZ"
+    with pytest.raises(ValueError):
+        find_one("000001.SZ")
+    with pytest.raises(ValueError):
+        find_one("000001.SZ", "20240102", "extra")
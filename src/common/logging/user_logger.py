@@ -7,6 +7,7 @@ import asyncio
 import json
 from .user_log_model import UserLog
 from panda_server.config.database import mongodb
+from panda_server.utils.mongo_batcher import mongo_batcher
 from panda_server.config.env import (
     RUN_MODE,
     WORKFLOW_EXCHANGE_NAME,
@@ -80,8 +81,7 @@ class UserLogger:
             self.sys_logger.error(f"Failed to publish user_log to queue, fallback to direct insert: {e}")
             try:
                 if mongodb.db is not None:
-                    collection = mongodb.db["workflow_logs"]
-                    await collection.insert_one(user_log.model_dump(by_alias=True))
+                    await mongo_batcher.insert_one("workflow_logs", user_log.model_dump(by_alias=True))
                     self.sys_logger.debug(f"User log inserted to database directly as fallback")
             except Exception as db_error:
                 self.sys_logger.error(f"Failed to insert user_log to database as fallback: {db_error}")
@@ -92,8 +92,7 @@ class UserLogger:
         if mongodb.db is None:
             self.sys_logger.warning("MongoDB not connected, cannot insert user log")
             return
-        collection = mongodb.db["workflow_logs"]
-        return await collection.insert_one(user_log.model_dump(by_alias=True))
+        return await mongo_batcher.insert_one("workflow_logs", user_log.model_dump(by_alias=True))
     
     async def _log(self, level: str, message: str, workflow_id: Optional[str] = None, work_node_id: Optional[str] = None, error_detail: Optional[str] = None, **kwargs):
         """内部日志记录方法（直接处理所有逻辑）"""
@@ -35,7 +35,7 @@ def future_api_domain_symbol(symbol: str, date: str):
         "symbol": symbol,
         "date": date
     }
-    bar_dict = quotation_mongo_db.mongo_find_one(
+    bar_dict = quotation_mongo_db.mongo_find_one_cached(
         db_name=config["MONGO_DB"],
         collection_name='future_market',
         query=query,
@@ -83,7 +83,8 @@ def future_api_quotation(symbol_list=None, start_date=None, end_date=None, field
         db_name=config["MONGO_DB"],
         collection_name=collection_name,
         query=query,
-        projection=fields_dict
+        projection=fields_dict,
+        batch_size=1000
     )
 
     # 处理查询结果为空的情况
@@ -71,7 +71,8 @@ def stock_api_quotation(symbol_list=None, start_date=None, end_date=None, fields
         db_name=config["MONGO_DB"],
         collection_name=collection_name,
         query=query,
-        projection=fields_dict
+        projection=fields_dict,
+        batch_size=1000
     )
 
     # 处理查询结果为空的情况
@@ -17,6 +17,10 @@ class FutureMarginMap(BaseFutureMarginMap):
     def __init__(self):
         self._cache = {}
         self.quotation_mongo_db = DatabaseHandler(config)
+        self._find_margin = self.quotation_mongo_db.make_find_one(
+            db_name="panda", collection_name="future_margin",
+            projection={'long_margin': 1, 'short_margin': 1, 'margin': 1},
+            fields=('symbol', 'trade_date'))
 
     def process_symbol(self,symbol: str) -> str:
         if symbol.endswith(".SHFE"):
@@ -32,8 +36,7 @@ class FutureMarginMap(BaseFutureMarginMap):
     def get_future_margin_info(self, symbol, trade_date):
         # collection = self.quotation_mongo_db.future_margin
         process_symbol=self.process_symbol(symbol)
-        instrument_info = self.quotation_mongo_db.mongo_find_one(db_name="panda",collection_name="future_margin",query=
-            {'symbol': str(process_symbol), 'trade_date': trade_date}, projection={'long_margin': 1, 'short_margin': 1, 'margin': 1})
+        instrument_info = self._find_margin(str(process_symbol), trade_date)
         if instrument_info:
             instrument_info['name'] = symbol
             return instrument_info
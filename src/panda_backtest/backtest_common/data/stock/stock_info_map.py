@@ -16,6 +16,10 @@ class StockInfoMap(BaseStockInfoMap):
     def __init__(self, quotation_mongo_db):
         self._cache = {}
         self.quotation_mongo_db = quotation_mongo_db
+        self._find_stock_info = quotation_mongo_db.make_find_one(
+            db_name=config["MONGO_DB"], collection_name="stock_info_new",
+            projection={'_id': 0, 'symbol': 1, 'name': 1, 'type': 1},
+            fields=('symbol',))
 
     def __getitem__(self, key):
         if key in self._cache.keys():
@@ -26,11 +30,7 @@ class StockInfoMap(BaseStockInfoMap):
             # collection = self.quotation_mongo_db.stock_info
             # start = time.time()
 
-            instrument_info = self.quotation_mongo_db.mongo_find_one(db_name=config["MONGO_DB"],
-                                                                     collection_name="stock_info_new",
-                                                                     query={'symbol': str(key)},
-                                                                     projection={'_id': 0, 'symbol': 1, 'name': 1, 'type': 1}
-                                                                     )
+            instrument_info = self._find_stock_info(str(key))
             if instrument_info:
                 self._cache[key] = instrument_info
                 # print('股票基本信息耗时：' + str(time.time() - start))
@@ -73,8 +73,9 @@ class TradeTimeManager(object):
                                                          query={
                                                              'nature_date': {'$gte': int(start), '$lte': int(end)},
                                                              'is_trade': 1, 'exchange': 'SH'},
-                                                         sort="nature_date")
-        trade_dates_list = list(docs)
+                                                         sort="nature_date", projection={'_id': 0, 'nature_date': 1},
+                                                         batch_size=1000)
+        trade_dates_list = docs
         # trade_dates_list = [str(doc["nature_date"]) for doc in docs]
         if len(trade_dates_list) == 0:
             event = Event(ConstantEvent.SYSTEM_CALCULATE_RESULT)
@@ -91,14 +92,14 @@ class TradeTimeManager(object):
                 # start_date = collection.find({
                 #     'nature_date': {'$lt': str(start)}, 'is_trade': 1, 'exchange': 'SH'}) \
                 #     .sort('nature_date', pymongo.DESCENDING).limit(1)
-                start_date = self.quotation_mongo_db.mongo_find_one(config['MONG_DB'], collection_name="trade_calendar",
+                start_date = self.quotation_mongo_db.mongo_find_one(config['MONGO_DB'], collection_name="trade_calendar",
                                                                     query={
                                                                         'nature_date': {'$lt': str(start)},
                                                                         'is_trade': 1, 'exchange': 'SH'},
-                                                                    sort=[('nature_date', -1)])
+                                                                    sort=[('nature_date', -1)],
+                                                                    projection={'_id': 0, 'nature_date': 1})
                 if start_date:
-                    start_date_dict = start_date.next()
-                    start_date = start_date_dict['nature_date']
+                    start_date = start_date['nature_date']
         else:
             if date_type == 1:
                 start_date = start
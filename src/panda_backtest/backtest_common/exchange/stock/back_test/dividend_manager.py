@@ -35,7 +35,7 @@ class DividendManager(object):
 
         # start = time.time()
         collection = "stock_dividends"
-        dividend_cur = self.quotation_mongo_db.mongo_find(config["MONGO_DB"], collection_name=collection,
+        dividend_cur = self.quotation_mongo_db.mongo_iter(config["MONGO_DB"], collection_name=collection,
                                                           query={'symbol': {'$in': list(all_pos_set)},
                                                                  'ex_div_date': strategy_context.trade_date},
                                                           projection={'_id': 0, 'symbol': 1, 'share_trans_ratio': 1,
@@ -44,7 +44,7 @@ class ETFSplitManager(object):
 
         event_bus = self.context.event_bus
         collection = "etf_split"
-        etf_split_list = self.quotation_mongo_db.mongo_find(config["MONGO_DB"],collection_name=collection,query={'symbol': {'$in': list(all_pos_set)},
+        etf_split_list = self.quotation_mongo_db.mongo_iter(config["MONGO_DB"],collection_name=collection,query={'symbol': {'$in': list(all_pos_set)},
              'trade_date': trade_date},projection={'_id': 0, 'symbol': 1, 'divcvratio': 1})
         # etf_split_list = collection.find(
         #     {'symbol': {'$in': list(all_pos_set)},
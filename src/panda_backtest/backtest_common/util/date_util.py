@@ -10,38 +10,34 @@ import logging
 from common.connector.mongodb_handler import DatabaseHandler
 from common.config.config import config
 
+TRADING_CALENDAR_PROJECTION = {'_id': 0, 'trading_date': 1, 'sort_idx': 1}
+
 
 class DateUtil(object):
     _quotation_db = DatabaseHandler(config)
+    _find_by_trading_date = staticmethod(_quotation_db.make_find_one(
+        db_name="panda", collection_name="trading_calendar_all", projection=TRADING_CALENDAR_PROJECTION,
+        fields=('trading_date',)))
+    _find_by_sort_idx = staticmethod(_quotation_db.make_find_one(
+        db_name="panda", collection_name="trading_calendar_all", projection=TRADING_CALENDAR_PROJECTION,
+        fields=('sort_idx',)))
 
     @classmethod
     def get_pre_date(cls, trade_date,pre_number=1):
-        curr_trade_date_cur = cls._quotation_db.mongo_find_one(db_name="panda", collection_name="trading_calendar_all",
-                                                               query={
-                                                                   'trading_date': str(trade_date),
-                                                               })
+        curr_trade_date_cur = cls._find_by_trading_date(str(trade_date))
         if not curr_trade_date_cur:
             return None
         sort_dex=curr_trade_date_cur['sort_idx']-pre_number
-        pre_trade_date = cls._quotation_db.mongo_find_one(db_name="panda", collection_name="trading_calendar_all",
-                                                               query={
-                                                                   'sort_idx': int(sort_dex),
-                                                               })
+        pre_trade_date = cls._find_by_sort_idx(int(sort_dex))
         return pre_trade_date['trading_date']
 
     @classmethod
     def get_next_trade_date(cls, trade_date,next_number=1):
-        curr_trade_date_cur = cls._quotation_db.mongo_find_one(db_name="panda", collection_name="trading_calendar_all",
-                                                              query={
-                                                                  'trading_date': str(trade_date),
-                                                              })
+        curr_trade_date_cur = cls._find_by_trading_date(str(trade_date))
         if not curr_trade_date_cur:
             return None
         sort_dex = curr_trade_date_cur['sort_idx'] + next_number
-        trade_date = cls._quotation_db.mongo_find_one(db_name="panda", collection_name="trading_calendar_all",
-                                                          query={
-                                                              'sort_idx': int(sort_dex),
-                                                          })
+        trade_date = cls._find_by_sort_idx(int(sort_dex))
         return trade_date['trading_date']
 
 
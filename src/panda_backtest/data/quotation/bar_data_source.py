@@ -175,7 +175,7 @@ class BarDataSource(BaseBarDataSource):
         collection = "future_1d_market"
 
         # bar_dict = self.quotation_mongo_db.mongo_find_one(db_name="panda",collection_name=collection,query={"trade_date": int(date), "symbol": symbol})
-        bar_dict = self.quotation_mongo_db.mongo_find_one(db_name="panda",collection_name=collection,query={"date": str(date), "symbol": symbol.split(".")[0]})
+        bar_dict = self.quotation_mongo_db.mongo_find_one(db_name="panda",collection_name=collection,query={"date": str(date), "symbol": symbol.split(".")[0]},projection={'_id': 0})
         bar = DailyQuotationData()
         if bar_dict:
             bar.__dict__ = bar_dict
@@ -299,7 +299,7 @@ class BarDataSource(BaseBarDataSource):
 
     def init_stock_list_daily_quotation_by_collection(self, symbol_list, trade_date, freq='1d', collection=None):
         if freq == '1d':
-            bar_cur = self.quotation_mongo_db.mongo_find(config["MONGO_DB"],collection_name=collection,query={"symbol": {'$in': symbol_list}, "trade_date": trade_date},projection={'_id': 0, 'insert_time': 0})
+            bar_cur = self.quotation_mongo_db.mongo_iter(config["MONGO_DB"],collection_name=collection,query={"symbol": {'$in': symbol_list}, "trade_date": trade_date},projection={'_id': 0, 'insert_time': 0})
             # bar_cur = collection.find({"symbol": {'$in': symbol_list}, "trade_date": trade_date},
             #                           {'_id': 0, 'insert_time': 0})
             for bar_dict in bar_cur:
@@ -314,11 +314,10 @@ class BarDataSource(BaseBarDataSource):
             for symbol in symbol_list:
                 self.stock_minute_bar[symbol] = dict()
 
-            bar_cur = collection.find({"trade_date": int(trade_date), "symbol": {'$in': symbol_list}}, {'_id': 0})
-            bar_cur = self.quotation_mongo_db.mongo_find(config["MONGO_DB"], collection_name=collection,
+            bar_cur = self.quotation_mongo_db.mongo_iter(config["MONGO_DB"], collection_name=collection,
                                                          query={"symbol": {'$in': symbol_list},
                                                                 "trade_date": trade_date},
-                                                         projection={'_id': 0})
+                                                         projection={'_id': 0}, batch_size=1000)
             for bar_dict in bar_cur:
                 bar = BarQuotationData()
                 if bar_dict:
@@ -339,7 +338,7 @@ class BarDataSource(BaseBarDataSource):
         # collection = self.quotation_mongo_db.daily_future_quotation
         if symbol_list:
             processed_symbol_list = [symbol.split(".")[0] for symbol in symbol_list]
-        bar_cur = self.quotation_mongo_db.mongo_find(db_name="panda",collection_name="future_1d_market",query={"date": str(trade_date), "symbol": {'$in': processed_symbol_list}})
+        bar_cur = self.quotation_mongo_db.mongo_iter(db_name="panda",collection_name="future_1d_market",query={"date": str(trade_date), "symbol": {'$in': processed_symbol_list}},projection={'_id': 0})
         # print('期货初始化日线查询====》trade_date：%s ' % trade_date)
         for bar_dict in bar_cur:
             bar = DailyQuotationData()
@@ -1,15 +1,14 @@
 import logging
 import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import AsyncMongoClient
+from pymongo import ReadPreference
+from common.config.config import get_config
+from common.connector.mongodb_handler import AsyncDatabaseHandler, use_event_loop, release_event_loop
 from panda_server.config.env import (
-    MONGO_URI,
     DATABASE_NAME,
     RUN_MODE,
-    MONGO_USER,
-    MONGO_PASSWORD,
-    MONGO_AUTH_DB,
-    MONGO_TYPE,
-    MONGO_REPLICA_SET,
+    MONGO_VERIFY_ON_STARTUP,
+    MONGO_NOTABLESCAN,
 )
 from panda_server.config.mongodb_index_config import init_all_indexes
 
@@ -21,8 +20,12 @@ class MongoDB:
     提供数据库连接、关闭和集合获取的功能
     """
 
-    client: AsyncIOMotorClient = None
+    client: AsyncMongoClient = None
+    _handler: AsyncDatabaseHandler = None
     db = None
+    _collections: dict = {}
+    _verify_task: asyncio.Task = None
+    _notablescan_enabled: bool = False
 
     @classmethod
     async def connect_db(cls):
@@ -31,39 +34,44 @@ class MongoDB:
         """
         logger.info("Attempting to connect to MongoDB...")
 
-        client_kwargs = {
-            "retryWrites": True,
-            "w": "majority",
-            "serverSelectionTimeoutMS": 5000,  # Faster timeout for server selection
-        }
-
-        if MONGO_TYPE == "standalone":
-            client_kwargs["directConnection"] = True
-        elif MONGO_TYPE == "replica_set":
-            client_kwargs["replicaSet"] = MONGO_REPLICA_SET
-
-        if MONGO_USER and MONGO_PASSWORD:
-            client_kwargs["username"] = MONGO_USER
-            client_kwargs["password"] = MONGO_PASSWORD
-            client_kwargs["authSource"] = MONGO_AUTH_DB or DATABASE_NAME
-
         try:
-            cls.client = AsyncIOMotorClient(MONGO_URI, **client_kwargs)
-            cls.db = cls.client.get_database(DATABASE_NAME)
-            
-            # Ping the database to verify connection
-            await asyncio.wait_for(cls.db.command("ping"), timeout=5)
+            # 与 DatabaseHandler（回测等同步代码）共用同一个客户端和连接池，同步调用提交到当前事件循环执行
+            use_event_loop(asyncio.get_running_loop())
+            cls._handler = AsyncDatabaseHandler(get_config())
+            cls.client = cls._handler.mongo_client
+            # 服务端接口和事务需要读到刚写入的数据，显式使用主节点读（从节点优先读只用于 DatabaseHandler 的集合）
+            cls.db = cls.client.get_database(DATABASE_NAME, read_preference=ReadPreference.PRIMARY)
+            cls._collections.clear()
             
-            logger.info(f"Successfully connected to MongoDB, database: '{DATABASE_NAME}'")
+            if MONGO_VERIFY_ON_STARTUP:
+                # Ping the database to verify connection
+                async with asyncio.timeout(5):
+                    await cls.db.command("ping")
+                logger.info(f"Successfully connected to MongoDB, database: '{DATABASE_NAME}'")
+            else:
+                # Verify in the background so startup is not blocked by the round trip
+                cls._verify_task = asyncio.create_task(cls._verify_connection())
             
         except Exception as e:
             logger.error(f"Failed to connect to MongoDB: {e}")
-            if cls.client:
-                cls.client.close()
+            if cls._handler:
+                await cls._handler.close()
+            release_event_loop(asyncio.get_running_loop())
             raise Exception(f"MongoDB Connection Error: {e}")
         
         return cls.db
 
+    @classmethod
+    async def _verify_connection(cls):
+        """
+        后台校验数据库连接，失败只记录日志，实际请求会在 serverSelectionTimeoutMS 后报错
+        """
+        try:
+            await cls.db.command("ping")
+            logger.info(f"Successfully connected to MongoDB, database: '{DATABASE_NAME}'")
+        except Exception as e:
+            logger.error(f"Failed to connect to MongoDB: {e}")
+
     @classmethod
     async def init_local_db(cls):
         """Initialize database indexes and other operations"""
@@ -79,16 +87,73 @@ class MongoDB:
                 logger.info("Database index initialization completed")
             except Exception as e:
                 logger.error(f"Database index initialization failed: {e}")
+            if MONGO_NOTABLESCAN:
+                await cls.enable_notablescan()
+            else:
+                await cls._warn_if_notablescan()
         else:
             logger.info("Cloud environment, skipping database index initialization")
     
+    @classmethod
+    async def _get_notablescan(cls):
+        result = await cls.client.admin.command({"getParameter": 1, "notablescan": 1})
+        return bool(result.get("notablescan"))
+
+    @classmethod
+    async def enable_notablescan(cls):
+        """
+        开启服务端 notablescan，让没有使用索引的查询直接失败，便于在上线前发现缺失的索引
+
+        该参数对整个 mongod 实例生效（同一实例上的其他应用也会受影响），由本进程开启的会在 close_db 时关闭；
+        进程异常退出时不会恢复，需要手动执行 db.adminCommand({setParameter: 1, notablescan: 0})
+        """
+        try:
+            if await cls._get_notablescan():
+                # 已由其他进程或手动开启，关闭时不恢复，避免影响开启它的一方
+                logger.warning("MongoDB notablescan is already enabled on the server")
+                return
+            await cls.client.admin.command({"setParameter": 1, "notablescan": 1})
+            cls._notablescan_enabled = True
+            logger.warning("MongoDB notablescan enabled, queries without a usable index will fail")
+        except Exception as e:
+            logger.error(f"Failed to enable MongoDB notablescan: {e}")
+
+    @classmethod
+    async def _warn_if_notablescan(cls):
+        """
+        MONGO_NOTABLESCAN 关闭但服务端仍开启 notablescan 时（如上次进程异常退出）提示手动关闭
+        """
+        try:
+            if await cls._get_notablescan():
+                logger.warning("MongoDB notablescan is still enabled on the server although MONGO_NOTABLESCAN is "
+                               "off, unindexed queries will fail; clear it with "
+                               "db.adminCommand({setParameter: 1, notablescan: 0})")
+        except Exception as e:
+            logger.error(f"Failed to read MongoDB notablescan: {e}")
+
+    @classmethod
+    async def _disable_notablescan(cls):
+        try:
+            await cls.client.admin.command({"setParameter": 1, "notablescan": 0})
+            logger.info("MongoDB notablescan disabled")
+        except Exception as e:
+            logger.error(f"Failed to disable MongoDB notablescan, clear it manually: {e}")
+        cls._notablescan_enabled = False
+
     @classmethod
     async def close_db(cls):
         """
         关闭数据库连接
         """
-        if cls.client:
-            cls.client.close()
+        if cls._verify_task and not cls._verify_task.done():
+            cls._verify_task.cancel()
+        cls._verify_task = None
+        if cls._notablescan_enabled:
+            await cls._disable_notablescan()
+        if cls._handler:
+            await cls._handler.close()
+            release_event_loop(asyncio.get_running_loop())
+            cls._collections.clear()
             logger.info("MongoDB connection closed.")
 
     @classmethod
@@ -98,7 +163,12 @@ class MongoDB:
         """
         if cls.db is None:
             raise Exception("Database not connected. Call connect_db() first.")
-        return cls.db[collection_name]
+        # 缓存集合对象，重新连接或关闭时清空
+        collection = cls._collections.get(collection_name)
+        if collection is None:
+            collection = cls.db[collection_name]
+            cls._collections[collection_name] = collection
+        return collection
 
 # 创建数据库连接实例
 mongodb = MongoDB()
@@ -8,6 +8,9 @@ from panda_server.config.mongodb_index_manager import sync_collection_indexes
 
 logger = logging.getLogger(__name__)
 
+# 按 workflow_run 顺序读取日志时使用的索引
+WORKFLOW_LOGS_SEQUENCE_INDEX = "workflow_logs_by_user_workflow_sequence_asc_idx"
+
 # 工作流日志索引定义
 WORKFLOW_LOGS_INDEXES = [
     {
@@ -26,7 +29,7 @@ WORKFLOW_LOGS_INDEXES = [
         "options": {}
     },
     {
-        "name": "workflow_logs_by_user_workflow_sequence_asc_idx",
+        "name": WORKFLOW_LOGS_SEQUENCE_INDEX,
         "keys": [("user_id", 1), ("workflow_run_id", 1), ("sequence", 1)],
         "options": {}
     },
@@ -24,7 +24,7 @@ async def sync_collection_indexes(db_instance, collection_name: str, indexes_to_
         # 获取现有索引
         existing_indexes = set()
         try:
-            indexes = await collection.list_indexes().to_list(length=None)
+            indexes = await (await collection.list_indexes()).to_list(length=None)
             existing_indexes = {index["name"] for index in indexes}
             logger.info(f"Existing {display_name} indexes: {existing_indexes}")
         except Exception as e:
@@ -3,6 +3,7 @@ from typing import Optional
 from bson import ObjectId
 from fastapi import HTTPException, status
 from panda_server.config.database import mongodb
+from panda_server.config.mongodb_index_config import WORKFLOW_LOGS_SEQUENCE_INDEX
 from common.logging.user_log_model import UserLog
 from panda_server.models.query_logs_response import (
     QueryWorkflowLogsResponse,
@@ -159,9 +160,11 @@ async def query_workflow_logs_with_filters(
         query["sequence"] = {"$gte": last_sequence}
     
     # 排序逻辑：如果有workflow_run_id，按sequence排序；否则按timestamp排序
+    find_args = {}
     if workflow_run_id:
-        # 同一个workflow内，按sequence升序排序确保日志顺序正确
+        # 同一个workflow内，按sequence升序排序确保日志顺序正确，强制使用 (user_id, workflow_run_id, sequence) 索引
         sort_criteria = [("sequence", 1)]
+        find_args["hint"] = WORKFLOW_LOGS_SEQUENCE_INDEX
     else:
         # 跨workflow查询时，按时间戳排序，同时考虑sequence作为次要排序
         sort_criteria = [("timestamp", 1), ("sequence", 1)]
@@ -169,7 +172,8 @@ async def query_workflow_logs_with_filters(
     cursor = collection.find(
         query,
         sort=sort_criteria,
-        limit=limit
+        limit=limit,
+        **find_args
     )
     
     logs = await cursor.to_list(length=limit)
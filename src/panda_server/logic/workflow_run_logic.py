@@ -95,8 +95,8 @@ async def workflow_run_logic(
     )
 
     # 使用事务同时执行插入工作流运行记录和更新工作流的last_run_id
-    async with await mongodb.client.start_session() as session:
-        async with session.start_transaction():
+    async with mongodb.client.start_session() as session:
+        async with await session.start_transaction():
             # 插入工作流运行记录
             result = await workflow_run_collection.insert_one(
                 workflow_run.model_dump(), session=session
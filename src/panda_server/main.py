@@ -7,6 +7,7 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from panda_server.config.database import mongodb
+from panda_server.utils.mongo_batcher import mongo_batcher
 from panda_server.config.env import *
 from panda_plugins.utils.work_node_loader import load_all_nodes
 from panda_server.messaging.consumer_manager import QueueConsumerManager
@@ -76,6 +77,8 @@ async def lifespan(app: FastAPI):
     yield
 
     # Shutdown logic
+    logger.info("Flushing pending MongoDB writes...")
+    await mongo_batcher.close()
     logger.info("Closing MongoDB connection...")
     await mongodb.close_db()
     logger.info("MongoDB connection closed")
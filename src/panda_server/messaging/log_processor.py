@@ -1,6 +1,7 @@
 import logging
 from typing import Dict, Any
 from panda_server.config.database import mongodb
+from panda_server.utils.mongo_batcher import mongo_batcher
 from common.logging.user_log_model import UserLog
 
 
@@ -53,9 +54,8 @@ class WorkflowLogQueueConsumer:
                 user_log.sequence = result["sequence"]
             
             # 直接插入数据库（绕过队列）
-            collection = mongodb.db["workflow_logs"]
-            result = await collection.insert_one(user_log.model_dump(by_alias=True, exclude_unset=True))
-            logging.getLogger(__name__).info(f"User log inserted with id: {result.inserted_id}, workflow_run_id: {user_log.workflow_run_id}")
+            inserted_id = await mongo_batcher.insert_one("workflow_logs", user_log.model_dump(by_alias=True, exclude_unset=True))
+            logging.getLogger(__name__).info(f"User log inserted with id: {inserted_id}, workflow_run_id: {user_log.workflow_run_id}")
             
         except Exception as e:
             logging.getLogger(__name__).error(f"Failed to insert workflow_log from queue: {e}")
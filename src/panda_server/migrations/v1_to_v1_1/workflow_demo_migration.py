@@ -53,9 +53,9 @@ async def main():
     workflow_id_list = [wid.strip() for wid in workflow_ids.split(",") if wid.strip()]
     failed_ids = []
     client = mongodb.client
-    async with await client.start_session() as session:
+    async with client.start_session() as session:
         try:
-            async with session.start_transaction():
+            async with await session.start_transaction():
                 for workflow_id in workflow_id_list:
                     print(f"Processing workflow_id: {workflow_id}")
                     success = await workflow_demo_migration_script(workflow_id, session=session)
@@ -595,7 +595,7 @@ async def get_real_trad_strategy_page_list(
     """
     try:
         # 获取MongoDB集合 (根据实际项目替换获取方式)
-        collection = mongodb.get_collection(REAL_TRAD_STRATEGY_COLLECTION)  # type: AsyncIOMotorCollection
+        collection = mongodb.get_collection(REAL_TRAD_STRATEGY_COLLECTION)  # type: AsyncCollection
 
         # 构建查询条件
         query = {}
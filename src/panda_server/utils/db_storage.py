@@ -8,7 +8,7 @@ from bson import Binary
 from panda_server.config.database import  mongodb
 from bson import ObjectId
 import logging
-from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from gridfs import AsyncGridFSBucket
 
 logger = logging.getLogger(__name__)
 
@@ -47,7 +47,7 @@ async def save_to_gridfs(bucket_name: str, obj: Any, filename: str = None, extra
     将整个 Pydantic 对象 pickle 后通过 GridFS 存储到 MongoDB，支持超过 16MB 的大文件。
     """
     raw_bytes = cloudpickle.dumps(obj)
-    fs = AsyncIOMotorGridFSBucket(mongodb.db, bucket_name=bucket_name)
+    fs = AsyncGridFSBucket(mongodb.db, bucket_name=bucket_name)
     file_name = filename or f"{obj.__class__.__name__}.pkl"
     # 上传数据
     file_id = await fs.upload_from_stream(
@@ -65,7 +65,7 @@ async def get_from_gridfs(bucket_name: str, file_id: str) -> tuple[Any, Exceptio
     从 GridFS 按 file_id 获取并反序列化对象。
     """
     try:
-        fs = AsyncIOMotorGridFSBucket(mongodb.db, bucket_name=bucket_name)
+        fs = AsyncGridFSBucket(mongodb.db, bucket_name=bucket_name)
         oid = ObjectId(file_id)
         stream = await fs.open_download_stream(oid)
         raw_bytes = await stream.read()
@@ -93,7 +93,7 @@ async def get_gridfs_metadata(bucket_name: str, file_id: str) -> dict | None:
         dict: 文件的metadata字典，如果文件不存在返回 None, 如果文件存在但没有metadata则返回 {}
     """
     try:
-        fs = AsyncIOMotorGridFSBucket(mongodb.db, bucket_name=bucket_name)
+        fs = AsyncGridFSBucket(mongodb.db, bucket_name=bucket_name)
         oid = ObjectId(file_id)
         grid_out = await fs.open_download_stream(oid)
         return grid_out.metadata or {}
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Tuple
+
+from bson import ObjectId
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError, WriteConcernError
+
+from panda_server.config.database import mongodb
+from panda_server.config.env import MONGO_BATCH_MAX_SIZE, MONGO_BATCH_MAX_WAIT_MS
+
+logger = logging.getLogger(__name__)
+
+
+class MongoBatcher:
+    """
+    MongoDB 写操作合并器
+
+    将同一集合在短时间窗口内提交的 InsertOne / UpdateOne 等写操作合并为一次
+    bulk_write(ordered=False)，并把每个操作的结果分发回对应的调用方。
+    """
+
+    def __init__(self, max_batch: int = MONGO_BATCH_MAX_SIZE, max_wait_ms: int = MONGO_BATCH_MAX_WAIT_MS):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+
+    async def submit(self, collection_name: str, op) -> Any:
+        """
+        提交一个写操作，等待其所在批次写入完成
+
+        Returns:
+            upsert 产生的 _id，其余情况为 None；写入失败时抛出对应异常
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._get_queue(collection_name).put_nowait((op, future))
+        return await future
+
+    async def insert_one(self, collection_name: str, document: dict) -> Any:
+        """
+        批量写入单个文档，返回文档的 _id
+        """
+        document.setdefault("_id", ObjectId())
+        await self.submit(collection_name, InsertOne(document))
+        return document["_id"]
+
+    async def close(self):
+        """
+        等待所有已提交的写操作落库后停止后台任务
+        """
+        for queue in self._queues.values():
+            await queue.join()
+        for worker in self._workers.values():
+            worker.cancel()
+        self._queues.clear()
+        self._workers.clear()
+
+    def _get_queue(self, collection_name: str) -> asyncio.Queue:
+        queue = self._queues.get(collection_name)
+        if queue is None:
+            queue = asyncio.Queue()
+            self._queues[collection_name] = queue
+            self._workers[collection_name] = asyncio.create_task(
+                self._drain(collection_name, queue)
+            )
+        return queue
+
+    async def _drain(self, collection_name: str, queue: asyncio.Queue):
+        while True:
+            batch = [await queue.get()]
+            # 只有存在并发写入时才等待一个时间窗口让其进入同一批次，逐条 await 的调用方不额外增加延迟
+            if 0 < queue.qsize() < self.max_batch - 1:
+                await asyncio.sleep(self.max_wait)
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await self._flush(collection_name, batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _flush(self, collection_name: str, batch: List[Tuple[Any, asyncio.Future]]):
+        ops = [op for op, _ in batch]
+        errors = {}
+        try:
+            result = await mongodb.get_collection(collection_name).bulk_write(ops, ordered=False)
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+            errors = {error["index"]: error for error in details.get("writeErrors", [])}
+        except Exception as e:
+            logger.error(f"Bulk write failed, collection: {collection_name}, ops: {len(ops)}, error: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        # 写关注错误（如 w:majority 未确认）不对应具体操作，批次内其余操作都不能视为成功
+        write_concern_errors = details.get("writeConcernErrors", [])
+        if write_concern_errors:
+            logger.error(f"Bulk write concern failed, collection: {collection_name}, errors: {write_concern_errors}")
+
+        upserted = {item["index"]: item["_id"] for item in details.get("upserted", [])}
+        for index, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if index in errors:
+                future.set_exception(BulkWriteError({"writeErrors": [errors[index]]}))
+            elif write_concern_errors:
+                error = write_concern_errors[0]
+                future.set_exception(WriteConcernError(error.get("errmsg"), error.get("code"), error))
+            else:
+                future.set_result(upserted.get(index))
+
+
+# 创建写操作合并器实例
+mongo_batcher = MongoBatcher()
@@ -0,0 +1,113 @@
+import asyncio
+import pytest
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, WriteConcernError
+from pymongo.results import BulkWriteResult
+
+from panda_server.utils import mongo_batcher as mongo_batcher_module
+from panda_server.utils.mongo_batcher import MongoBatcher
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeCollection:
+    """记录每次 bulk_write 的批次，并返回预设结果的假集合"""
+
+    def __init__(self, details=None, error=None):
+        self.batches = []
+        self.details = details or {}
+        self.error = error
+
+    async def bulk_write(self, ops, ordered=True):
+        assert ordered is False
+        self.batches.append(list(ops))
+        if self.error is not None:
+            raise self.error
+        return BulkWriteResult(self.details, True)
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    fake = FakeCollection()
+    monkeypatch.setattr(mongo_batcher_module.mongodb, "get_collection", lambda name: fake)
+    return fake
+
+
+async def test_sequential_writes_are_not_delayed(collection):
+    """测试逐条 await 的写入不等待合并窗口"""
+    batcher = MongoBatcher(max_wait_ms=200)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for i in range(5):
+        await batcher.insert_one("logs", {"i": i})
+    await batcher.close()
+    assert loop.time() - start < 0.2
+    assert [len(batch) for batch in collection.batches] == [1] * 5
+
+
+async def test_concurrent_writes_are_coalesced(collection):
+    """测试并发写入合并为一次 bulk_write，并返回各自的 _id"""
+    batcher = MongoBatcher(max_wait_ms=5)
+    documents = [{"i": i} for i in range(20)]
+    ids = await asyncio.gather(*(batcher.insert_one("logs", document) for document in documents))
+    await batcher.close()
+    assert ids == [document["_id"] for document in documents]
+    assert sum(len(batch) for batch in collection.batches) == 20
+    assert len(collection.batches) < 20
+
+
+async def test_upserted_id_is_returned_to_its_caller(collection):
+    """测试 upsert 产生的 _id 只返回给对应的调用方"""
+    collection.details = {"upserted": [{"index": 1, "_id": "new-id"}]}
+    batcher = MongoBatcher(max_wait_ms=5)
+    results = await asyncio.gather(
+        batcher.submit("logs", UpdateOne({"a": 1}, {"$set": {"b": 1}})),
+        batcher.submit("logs", UpdateOne({"a": 2}, {"$set": {"b": 2}}, upsert=True)),
+    )
+    await batcher.close()
+    assert results == [None, "new-id"]
+
+
+async def test_write_errors_only_fail_their_own_operation(collection):
+    """测试单条写入错误只传递给对应的调用方，其余操作正常返回"""
+    collection.error = BulkWriteError({
+        "writeErrors": [{"index": 1, "code": 11000, "errmsg": "duplicate key"}],
+        "writeConcernErrors": [],
+    })
+    batcher = MongoBatcher(max_wait_ms=5)
+    results = await asyncio.gather(
+        *(batcher.submit("logs", InsertOne({"i": i})) for i in range(3)),
+        return_exceptions=True,
+    )
+    await batcher.close()
+    assert results[0] is None and results[2] is None
+    assert isinstance(results[1], BulkWriteError)
+    assert results[1].details["writeErrors"][0]["code"] == 11000
+
+
+async def test_write_concern_errors_fail_whole_batch(collection):
+    """测试写关注错误时批次内的操作都不会被当作成功"""
+    collection.error = BulkWriteError({
+        "writeErrors": [],
+        "writeConcernErrors": [{"code": 64, "errmsg": "waiting for replication timed out"}],
+    })
+    batcher = MongoBatcher(max_wait_ms=5)
+    results = await asyncio.gather(
+        *(batcher.submit("logs", InsertOne({"i": i})) for i in range(3)),
+        return_exceptions=True,
+    )
+    await batcher.close()
+    assert all(isinstance(result, WriteConcernError) for result in results)
+    assert results[0].code == 64
+
+
+async def test_unexpected_error_fails_whole_batch(collection):
+    """测试非批量写入错误传递给批次内的所有调用方"""
+    collection.error = RuntimeError("connection lost")
+    batcher = MongoBatcher(max_wait_ms=5)
+    results = await asyncio.gather(
+        *(batcher.submit("logs", InsertOne({"i": i})) for i in range(2)),
+        return_exceptions=True,
+    )
+    await batcher.close()
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -4,7 +4,7 @@ from common.connector.mongodb_handler import DatabaseHandler as MongoClient
 
 class CtpMongoData(object):
     def __init__(self):
-        self.ctp_mongo_db = MongoClient.get_mongo_db()
+        self.ctp_mongo_db = MongoClient.instance().get_mongo_db()
 
     def save_work_order(self, account, order):
         print('=================================更新订单=================================')
@@ -16,7 +16,7 @@ from panda_backtest.backtest_common.data.future.base_future_info_map import Base
 class FutureInfoMap(BaseFutureInfoMap):
     def __init__(self):
         self._cache = {}
-        self.quotation_mongo_db = MongoClient.get_mongo_db()
+        self.quotation_mongo_db = MongoClient.instance().get_mongo_db()
         self.redis_client = RedisClient()
 
     def __getitem__(self, key):
@@ -3,7 +3,7 @@ from common.connector.mongodb_handler import DatabaseHandler as MongoClient
 
 class PrintLog(object):
 
-    __mongo_client = MongoClient.get_mongo_db()
+    __mongo_client = MongoClient.instance().get_mongo_db()
 
     @classmethod
     def start_print(cls, mock_id):
@@ -8,7 +8,7 @@ from tabulate import tabulate
 
 class PrintTrade(object):
 
-    __mongo_client = MongoClient.get_mongo_db()
+    __mongo_client = MongoClient.instance().get_mongo_db()
 
     @classmethod
     def start_print(cls, mock_id):
@@ -25,7 +25,7 @@ class FutureReverseResult(object):
 
     def __init__(self, account):
         self.context = CoreContext.get_instance()
-        self.business_mongo = MongoClient.get_mongo_db()
+        self.business_mongo = MongoClient.instance().get_mongo_db()
         self.xb_back_test_account = XbBacktestAccount()
         self.xb_back_test_account.account_id = account
         self.xb_back_test_account.type = 1
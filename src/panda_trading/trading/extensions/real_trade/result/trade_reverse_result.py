@@ -22,7 +22,7 @@ class TradeReverseResult(object):
         # 相关数据
         self.logger = LogFactory.get_logger()
         self.context = CoreContext.get_instance()
-        self.business_mongo = MongoClient.get_mongo_db()
+        self.business_mongo = MongoClient.instance().get_mongo_db()
         # self.mysql_client = MysqlClient.get_mysql_client()
 
         self.xb_back_test_account = XbBacktestAccount()